@@ -1,6 +1,8 @@
 import asyncio
+import logging
 import random
-from typing import List, Dict, TypeVar, Callable, Awaitable
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Dict, TypeVar, Callable, Awaitable
 
 from atproto import AsyncClient, models
 from atproto_client.exceptions import (
@@ -14,6 +16,8 @@ K = TypeVar("K")
 V = TypeVar("V")
 CLIENT_BANDWIDTH = 10
 
+logger = logging.getLogger(__name__)
+
 
 class BlueskyAPI:
     """
@@ -23,6 +27,30 @@ class BlueskyAPI:
 
     def __init__(self, client: AsyncClient):
         self._client = client
+        # Load counters, updated through track_request()
+        self.in_flight = 0
+        self.total_requests = 0
+
+    @contextmanager
+    def track_request(self) -> Iterator["BlueskyAPI"]:
+        """Count a request against this client while the block runs."""
+        self.in_flight += 1
+        self.total_requests += 1
+        try:
+            yield self
+        finally:
+            self.in_flight -= 1
+
+    @classmethod
+    async def _from_session_string(cls, ss: str) -> "BlueskyAPI":
+        """Log in an AsyncClient at the session string's domain and wrap it."""
+        domain = ss.split(":::")[-1]
+        client = AsyncClient(domain)
+        try:
+            await client.login(session_string=ss)
+        except (BadRequestError, RequestException, ValueError) as e:
+            raise RuntimeError(f"Login failed for '{ss[:8]}…': {e}")
+        return cls(client)
 
     @classmethod
     async def load_sessions(cls, session_strings: List[str]) -> List["BlueskyAPI"]:
@@ -30,21 +58,24 @@ class BlueskyAPI:
         For each session_string in the list, split on ':::' to get its domain,
         login an AsyncClient at that domain, and return a list of BlueskyAPI
         instances wrapping those clients.
+
+        Logins run concurrently, up to CLIENT_BANDWIDTH at a time; any that
+        fail are replaced from the remaining session strings.
         """
         apis: List[BlueskyAPI] = []
-        bads: List[str] = []
-        for ss in session_strings:
-            if len(apis) < CLIENT_BANDWIDTH:
-                try:
-                    domain = ss.split(":::")[-1]
-                    client = AsyncClient(domain)
-                    try:
-                        await client.login(session_string=ss)
-                    except (BadRequestError, RequestException, ValueError) as e:
-                        raise RuntimeError(f"Login failed for '{ss[:8]}…': {e}")
-                    apis.append(cls(client))
-                except:
-                    bads.append(ss)
+        remaining = list(session_strings)
+        while remaining and len(apis) < CLIENT_BANDWIDTH:
+            needed = CLIENT_BANDWIDTH - len(apis)
+            wave, remaining = remaining[:needed], remaining[needed:]
+            results = await asyncio.gather(
+                *(cls._from_session_string(ss) for ss in wave),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    logger.warning("Skipping Bluesky session: %s", result)
+                else:
+                    apis.append(result)
         return apis
 
     async def _login_client(self, client: AsyncClient, session_string: str):
@@ -64,33 +95,52 @@ class BlueskyAPI:
         """Split `items` into chunks, call `fetcher` on each, and merge the dicts."""
         if not items:
             return {}
-        tasks = [
-            fetcher(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size)
-        ]
-        chunks = await asyncio.gather(*tasks)
-        merged: Dict[K, V] = {}
-        for d in chunks:
-            merged.update(d)
-        return merged
+        if len(items) <= chunk_size:
+            # Single chunk: no need for gather or a merge
+            return await fetcher(items)
+        chunks = await asyncio.gather(
+            *(
+                fetcher(items[i : i + chunk_size])
+                for i in range(0, len(items), chunk_size)
+            )
+        )
+        return {k: v for d in chunks for k, v in d.items()}
+
+    async def _query_json(self, nsid: str, params) -> Dict[str, Any]:
+        """
+        Invoke an XRPC query and return the decoded JSON body as-is, skipping
+        the pydantic response model. Callers only ever re-serialize the
+        result, so validating it into models and dumping it back is wasted.
+        """
+        resp = await self._client.invoke_query(
+            nsid, params=params, output_encoding="application/json"
+        )
+        return resp.content
 
     async def get_user_data_for_dids(
         self, dids: List[str]
-    ) -> Dict[str, models.AppBskyActorDefs.ProfileViewDetailed]:
-        """Fetch profiles for many DIDs, in pages of 25."""
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch raw profile dicts for many DIDs, in pages of 25."""
 
         async def fetch_profiles(sub: List[str]):
-            resp = await self._client.app.bsky.actor.get_profiles({"actors": sub})
-            return {p.did: p for p in resp.profiles}
+            body = await self._query_json(
+                "app.bsky.actor.getProfiles",
+                models.AppBskyActorGetProfiles.Params(actors=sub),
+            )
+            return {p["did"]: p for p in body.get("profiles", [])}
 
         return await self._chunked_map(dids, 25, fetch_profiles)
 
     async def hydrate_records_for_uris(
         self, uris: List[str]
-    ) -> Dict[str, models.AppBskyFeedDefs.PostView]:
-        """Fetch posts for many URIs, in pages of 25."""
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch raw post dicts for many URIs, in pages of 25."""
 
         async def fetch_posts(sub: List[str]):
-            resp = await self._client.app.bsky.feed.get_posts({"uris": sub})
-            return {p.uri: p for p in resp.posts}
+            body = await self._query_json(
+                "app.bsky.feed.getPosts",
+                models.AppBskyFeedGetPosts.Params(uris=sub),
+            )
+            return {p["uri"]: p for p in body.get("posts", [])}
 
         return await self._chunked_map(uris, 25, fetch_posts)
@@ -1,18 +1,28 @@
 import asyncio
 import sqlite3
-import json
 from pathlib import Path
 import os
-import zipfile
+import shutil
 import logging
 import aioboto3
+import aiosqlite
+import orjson
 from datetime import datetime, timedelta
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 import redis.asyncio as redis
-from social.graze.jetstream_turbo.app.remote_storage import upload_file_to_s3
+import zstandard
+from social.graze.jetstream_turbo.app.remote_storage import (
+    S3_TRANSFER_CONFIG,
+    upload_file_to_s3,
+)
 
 logger = logging.getLogger(__name__)
 
+ZSTD_READ_SIZE = 1024 * 1024  # bytes fed to the compressor per read
+SMALL_DB_BYTES = 64 * 1024 * 1024  # below this, compress in memory and PUT
+STREAM_FIELD = b"data"  # field name for each stream entry, pre-encoded
+INDEXED_COLUMNS = ("at_uri", "did", "time_us")
+
 
 class Egress:
     """
@@ -39,7 +49,7 @@ class Egress:
         self.stream_name = stream_name
         self.trim_maxlen = trim_maxlen
 
-        self.conn: Optional[sqlite3.Connection] = None
+        self.conn: Optional[aiosqlite.Connection] = None
         self.db_start_time: Optional[datetime] = None
         self.current_db_path: Optional[str] = None
 
@@ -50,8 +60,17 @@ class Egress:
             asyncio.create_task(self._compress_and_ship_old_db(rotate_old_db_path))
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         self.current_db_path = os.path.join(self.db_dir, f"jetstream_{timestamp}.db")
-        self.conn = sqlite3.connect(self.current_db_path, check_same_thread=False)
-        self.conn.execute(
+        # aiosqlite runs the connection on a background thread, keeping disk I/O
+        # (and fsync on commit) off the event loop.
+        self.conn = await aiosqlite.connect(self.current_db_path)
+        for pragma in (
+            "journal_mode=WAL",
+            "synchronous=NORMAL",
+            "temp_store=MEMORY",
+            "mmap_size=268435456",
+        ):
+            await self.conn.execute(f"PRAGMA {pragma};")
+        await self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS records (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,41 +81,77 @@ class Egress:
                 message_metadata TEXT CHECK(json_valid(message_metadata))
             )"""
         )
-        for idx in ("at_uri", "did", "time_us"):
-            self.conn.execute(
-                f"CREATE INDEX IF NOT EXISTS idx_records_{idx} ON records({idx});"
-            )
-        self.conn.commit()
+        # Indexes are built once the DB is closed (see _build_indexes), so
+        # inserts don't pay for index maintenance on every batch.
+        await self.conn.commit()
         self.db_start_time = datetime.utcnow()
 
+    @staticmethod
+    def _build_indexes(db_path: str):
+        """Index a finished DB in one pass; blocking, run it in a thread."""
+        conn = sqlite3.connect(db_path)
+        try:
+            for idx in INDEXED_COLUMNS:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_records_{idx} ON records({idx});"
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _zstd_compress_file(src_path: str, dest_path: str):
+        """Stream-compress `src_path` into `dest_path` using all cores."""
+        cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+            with cctx.stream_writer(dest) as writer:
+                shutil.copyfileobj(src, writer, ZSTD_READ_SIZE)
+
+    @staticmethod
+    def _zstd_compress_bytes(src_path: str) -> bytes:
+        """Compress `src_path` fully in memory; only meant for small files."""
+        cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+        with open(src_path, "rb") as src:
+            return cctx.compress(src.read())
+
     async def _compress_and_ship_old_db(self, old_db_path: str):
         if not os.path.exists(old_db_path):
             logger.warning(f"Old DB not found at {old_db_path}, skipping upload.")
             return
-        # Build zip path
-        zip_path = old_db_path + ".zip"
+        # Build zst path
+        zst_path = old_db_path + ".zst"
+        key = Path(zst_path).name
         try:
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                zf.write(old_db_path, arcname=Path(old_db_path).name)
+            await asyncio.to_thread(self._build_indexes, old_db_path)
             await self._init_s3_client()
-            await Egress.S3_CLIENT.upload_file(
-                zip_path, self.s3_bucket, Path(zip_path).name
-            )
+            # Compression is CPU-bound; keep it off the event loop
+            if os.path.getsize(old_db_path) < SMALL_DB_BYTES:
+                # Small DBs skip the temp file and go up in a single PUT
+                body = await asyncio.to_thread(self._zstd_compress_bytes, old_db_path)
+                await Egress.S3_CLIENT.put_object(
+                    Bucket=self.s3_bucket, Key=key, Body=body
+                )
+            else:
+                await asyncio.to_thread(self._zstd_compress_file, old_db_path, zst_path)
+                await Egress.S3_CLIENT.upload_file(
+                    zst_path, self.s3_bucket, key, Config=S3_TRANSFER_CONFIG
+                )
             logger.info(
-                "Zipped & shipped %s to s3://%s/%s",
+                "Compressed & shipped %s to s3://%s/%s",
                 old_db_path,
                 self.s3_bucket,
-                Path(zip_path).name,
+                key,
             )
-            # --- CLEANUP: delete both the raw DB and its ZIP ---
+            # --- CLEANUP: delete both the raw DB and its ZST ---
             try:
                 os.remove(old_db_path)
-                os.remove(zip_path)
-                logger.info("Deleted local files %s and %s", old_db_path, zip_path)
+                if os.path.exists(zst_path):
+                    os.remove(zst_path)
+                logger.info("Deleted local files for %s", old_db_path)
             except OSError as rm_err:
-                logger.warning("Failed to delete old DB or zip: %s", rm_err)
+                logger.warning("Failed to delete old DB or zst: %s", rm_err)
         except Exception as e:
-            logger.error("Failed to zip/upload %s: %s", old_db_path, e)
+            logger.error("Failed to compress/upload %s: %s", old_db_path, e)
             if Egress.S3_CLIENT:
                 await Egress.S3_CLIENT.close()
                 Egress.S3_CLIENT = None
@@ -127,22 +182,71 @@ class Egress:
             Egress.REDIS_CLIENT = client
             logger.info("Connected to Redis at %s", url)
 
+    def _serialize_record(self, r: Dict[str, Any]) -> Tuple[tuple, bytes]:
+        """
+        Encode a record once and return both its SQLite row and its stream
+        payload. The payload is spliced from the already-encoded message and
+        metadata, so it matches orjson.dumps(r) without encoding them twice.
+        """
+        at_uri = r.get("at_uri", "")
+        did = r.get("did", "")
+        time_us = r.get("time_us")
+        message_json = orjson.dumps(r.get("message", {}), default=str)
+        metadata_json = orjson.dumps(r.get("hydrated_metadata", {}), default=str)
+        # SQLite keeps TEXT columns: recent SQLite reads a BLOB passed to
+        # json_valid() as JSONB, which would fail the CHECK constraints.
+        row = (
+            at_uri,
+            did,
+            self._parse_time_us(time_us),
+            message_json.decode(),
+            metadata_json.decode(),
+        )
+        payload = b"".join(
+            (
+                b'{"at_uri":',
+                orjson.dumps(at_uri),
+                b',"did":',
+                orjson.dumps(did),
+                b',"time_us":',
+                orjson.dumps(time_us, default=str),
+                b',"message":',
+                message_json,
+                b',"hydrated_metadata":',
+                metadata_json,
+                b"}",
+            )
+        )
+        return row, payload
+
     async def push_batch_to_stream(self, batch: List[Dict[str, Any]]):
         if not batch:
             return
+        await self._push_payloads_to_stream(
+            [orjson.dumps(item, default=str) for item in batch]
+        )
+
+    async def _push_payloads_to_stream(self, payloads: List[bytes]):
+        if not payloads:
+            return
         await self._init_redis_client()
         client = Egress.REDIS_CLIENT
-        pipe = client.pipeline()
-        for item in batch:
-            pipe.xadd(self.stream_name, {"data": json.dumps(item)})
-        if self.trim_maxlen is not None:
-            # single trim for the entire batch
-            pipe.xtrim(self.stream_name, maxlen=self.trim_maxlen, approximate=True)
+        # Entries are independent appends, so skip the MULTI/EXEC wrapper
+        pipe = client.pipeline(transaction=False)
+        stream_name = self.stream_name
+        maxlen = self.trim_maxlen
+        for payload in payloads:
+            # Trim is fused into each XADD (MAXLEN ~), no separate XTRIM needed
+            pipe.xadd(
+                stream_name, {STREAM_FIELD: payload}, maxlen=maxlen, approximate=True
+            )
         await pipe.execute()
 
     async def store_records(self, enriched_records: List[Dict[str, Any]]):
         if not enriched_records:
             return
+        # Encode outside the lock; rows and stream payloads share the same JSON
+        serialized = [self._serialize_record(r) for r in enriched_records]
         async with self._writer_lock:
             if self.conn is None:
                 await self._create_new_db()
@@ -152,31 +256,30 @@ class Egress:
                 >= timedelta(minutes=self.ROTATION_MINUTES)
             ):
                 old = self.current_db_path
-                self.conn.close()
+                await self.conn.close()
                 self.conn = None
                 await self._create_new_db(rotate_old_db_path=old)
-            rows = [
-                (
-                    r.get("at_uri", ""),
-                    r.get("did", ""),
-                    self._parse_time_us(r.get("time_us")),
-                    json.dumps(r.get("message", {})),
-                    json.dumps(r.get("hydrated_metadata", {})),
+            # One explicit write transaction per batch; rows are streamed to
+            # executemany rather than copied into another list.
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                await self.conn.executemany(
+                    "INSERT INTO records(at_uri,did,time_us,message,message_metadata) VALUES(?,?,?,?,?)",
+                    (row for row, _ in serialized),
                 )
-                for r in enriched_records
-            ]
-            cur = self.conn.cursor()
-            cur.executemany(
-                "INSERT INTO records(at_uri,did,time_us,message,message_metadata) VALUES(?,?,?,?,?)",
-                rows,
-            )
-            self.conn.commit()
-            cur.close()
+                await self.conn.commit()
+            except BaseException:
+                # Don't leave the transaction open, or every later BEGIN fails.
+                # BaseException so a cancelled task rolls back too; aiosqlite
+                # queues this after any still-running executemany.
+                await self.conn.rollback()
+                raise
         # Trimmed stream push
-        await self.push_batch_to_stream(enriched_records)
+        await self._push_payloads_to_stream([payload for _, payload in serialized])
 
     async def close(self):
         async with self._writer_lock:
             if self.conn:
-                self.conn.close()
+                await self.conn.close()
                 self.conn = None
+                await asyncio.to_thread(self._build_indexes, self.current_db_path)
@@ -1,45 +1,13 @@
 import asyncio
-import random
 import time
-from typing import List, Dict, Any, Tuple, Set
-import aiorwlock
+from typing import List, Dict, Any, Optional, Tuple, Set
 from collections import OrderedDict
 
 from social.graze.jetstream_turbo.app.bluesky_api import BlueskyAPI
 
-
-class LRUCache:
-    """
-    A simple LRU (Least Recently Used) cache based on OrderedDict.
-    Not thread-safe or async-safe by itself—use it behind a lock.
-    """
-
-    def __init__(self, max_size: int = 1000):
-        self.max_size = max_size
-        self.cache = OrderedDict()  # key -> value
-
-    def get(self, key: str):
-        """
-        Return the cached value or None if not present.
-        Move the accessed key to the end (most recently used).
-        """
-        if key not in self.cache:
-            return None
-        value = self.cache.pop(key)
-        self.cache[key] = value  # re-insert to mark as most recently used
-        return value
-
-    def set(self, key: str, value: Any):
-        """
-        Insert or update a key-value pair, evicting if needed.
-        """
-        # If key exists, pop it so we can re-insert to update order
-        if key in self.cache:
-            self.cache.pop(key)
-        elif len(self.cache) >= self.max_size:
-            # Evict least recently used item
-            self.cache.popitem(last=False)  # pop from the front
-        self.cache[key] = value
+# Shared read-only fallback for missing sub-objects; never mutate it.
+_EMPTY: Dict[str, Any] = {}
+MENTION_TYPE = "app.bsky.richtext.facet#mention"
 
 
 class Hydration:
@@ -54,19 +22,24 @@ class Hydration:
           user: the user profile object of the posting user,
           mentions: dict of { mentionDid: userProfileObject },
           parent_post: resolved data for parent post,
-          reply_post: resolved data for root post
+          reply_post: resolved data for root post,
+          quote_post: resolved data for the quoted post
         }
+
+    Profile and post objects are the raw XRPC JSON from getProfiles/getPosts
+    (camelCase keys such as displayName, plus $type, with absent fields
+    omitted), not pydantic model_dump() output with snake_case keys.
     """
 
-    # Class-level caches (shared by all calls).
+    # Class-level LRU caches (shared by all calls). These are plain
+    # OrderedDicts: a hit is moved to the end, and inserts past the size
+    # limit evict from the front. Not thread-safe, but every operation is
+    # synchronous, so coroutines on a single event loop can share them.
     user_cache_size = 20000
     post_cache_size = 20000
 
-    _user_cache = LRUCache(max_size=user_cache_size)
-    _post_cache = LRUCache(max_size=post_cache_size)
-
-    # Single RWLock guarding both caches:
-    _cache_lock = aiorwlock.RWLock()
+    _user_cache: "OrderedDict[str, Any]" = OrderedDict()
+    _post_cache: "OrderedDict[str, Any]" = OrderedDict()
 
     @classmethod
     def configure_cache(cls, user_cache_size: int, post_cache_size: int):
@@ -75,8 +48,8 @@ class Hydration:
         """
         cls.user_cache_size = user_cache_size
         cls.post_cache_size = post_cache_size
-        cls._user_cache = LRUCache(max_size=user_cache_size)
-        cls._post_cache = LRUCache(max_size=post_cache_size)
+        cls._user_cache = OrderedDict()
+        cls._post_cache = OrderedDict()
 
     @staticmethod
     async def hydrate_bulk(
@@ -94,117 +67,135 @@ class Hydration:
         all_dids: Set[str] = set()
         all_uris: Set[str] = set()
         mention_dids_global: Set[str] = set()
+        # Per-record (commit, c_record, parent_uri, root_uri), reused in the final pass
+        record_parts: List[Tuple[dict, dict, Optional[str], Optional[str]]] = []
 
-        for idx, rec in enumerate(records):
-            rec_dids = set()
+        # Bind hot bound methods to locals once; the loops below run per record
+        did_add = all_dids.add
+        uri_add = all_uris.add
+        mentions_update = mention_dids_global.update
+        parts_append = record_parts.append
 
+        for idx, rec in enumerate(records):
             did = rec.get("did")
             if did:
-                all_dids.add(did)
+                did_add(did)
 
-            commit = rec.get("commit", {})
-            c_record = commit.get("record", {})
+            commit = rec.get("commit") or _EMPTY
+            c_record = commit.get("record") or _EMPTY
 
             # —— QUOTE PATCH —— detect quote embed URIs
-            embed = c_record.get("embed", {})
+            embed = c_record.get("embed") or _EMPTY
             if embed.get("$type") == "app.bsky.embed.record":
-                quote_uri = embed.get("record", {}).get("uri")
+                quote_uri = (embed.get("record") or _EMPTY).get("uri")
                 if quote_uri:
-                    all_uris.add(quote_uri)
+                    uri_add(quote_uri)
                     record_embed_map[idx] = quote_uri
 
             # Collect mention DID(s) from facets
-            facets = c_record.get("facets", [])
-            for facet in facets:
-                features = facet.get("features", [])
-                for feature in features:
-                    if feature.get("$type") == "app.bsky.richtext.facet#mention":
-                        mention_did = feature.get("did")
-                        if mention_did:
-                            rec_dids.add(mention_did)
-                            mention_dids_global.add(mention_did)
-
-            reply = c_record.get("reply", {})
-            parent_uri = reply.get("parent", {}).get("uri")
+            rec_dids = {
+                feature["did"]
+                for facet in c_record.get("facets") or ()
+                for feature in facet.get("features") or ()
+                if feature.get("$type") == MENTION_TYPE and feature.get("did")
+            }
+            mentions_update(rec_dids)
+
+            reply = c_record.get("reply") or _EMPTY
+            parent_uri = (reply.get("parent") or _EMPTY).get("uri")
             if parent_uri:
-                all_uris.add(parent_uri)
-            root_uri = reply.get("root", {}).get("uri")
+                uri_add(parent_uri)
+            root_uri = (reply.get("root") or _EMPTY).get("uri")
             if root_uri:
-                all_uris.add(root_uri)
+                uri_add(root_uri)
 
             record_mentions_map[idx] = rec_dids
+            parts_append((commit, c_record, parent_uri, root_uri))
 
         # Combine posting user DIDs + mention DIDs
         all_dids.update(mention_dids_global)
 
-        # Filter out the DIDs & URIs that are already cached
-        # We'll do a read-lock while we check the caches.
-
-        async with Hydration._cache_lock.reader_lock:
-            missing_dids = [d for d in all_dids if Hydration._user_cache.get(d) is None]
-            missing_uris = [u for u in all_uris if Hydration._post_cache.get(u) is None]
-
-        # 2) Get a single BlueskyAPI object
-        api = random.choice(api_clients)
-
-        # 3) Bulk fetch only missing user data and post data in parallel
-        #    Then populate the cache in a single (writer) lock.
-        async def fetch_missing_users():
-            if not missing_dids:
-                return {}
-            # We'll get a list of [ (did, profile) ... ] or something similar
-            profiles = await api.get_user_data_for_dids(missing_dids)
-            return profiles
-
-        async def fetch_missing_posts():
-            if not missing_uris:
-                return {}
-            # This returns List[(uri, data)]
-            posts = await api.hydrate_records_for_uris(missing_uris)
-            return posts
-
-        fetched_users, fetched_posts = await asyncio.gather(
-            fetch_missing_users(), fetch_missing_posts()
-        )
-
-        # 4) Put fetched items into the cache
-        async with Hydration._cache_lock.writer_lock:
-            # Add user profiles to cache
-            for did, profile in fetched_users.items():
-                # 'profile' might be an object with `.did`
-                if hasattr(profile, "did"):
-                    Hydration._user_cache.set(profile.did, profile.model_dump())
-            # Add post data to cache
-            for uri, post_data in fetched_posts.items():
-                Hydration._post_cache.set(
-                    uri,
-                    post_data.model_dump()
-                    if hasattr(post_data, "model_dump")
-                    else post_data,
-                )
-
-            # Now read from cache with updated contents
-            did_to_profile = {}
-            for d in all_dids:
-                val = Hydration._user_cache.get(d)
-                if val is not None:
-                    # Move it to the end (most recently used)
-                    Hydration._user_cache.set(d, val)
+        # Pull whatever is already cached and note the DIDs & URIs that aren't.
+        # Cache access never awaits, so no lock is needed around it.
+        did_to_profile: Dict[str, Any] = {}
+        uri_to_post: Dict[str, Any] = {}
+        missing_dids: List[str] = []
+        missing_uris: List[str] = []
+        user_cache = Hydration._user_cache
+        post_cache = Hydration._post_cache
+        user_get = user_cache.get
+        user_touch = user_cache.move_to_end
+        post_get = post_cache.get
+        post_touch = post_cache.move_to_end
+
+        for d in all_dids:
+            val = user_get(d)
+            if val is None:
+                missing_dids.append(d)
+            else:
+                user_touch(d)  # mark as most recently used
                 did_to_profile[d] = val
-
-            uri_to_post = {}
-            for u in all_uris:
-                val = Hydration._post_cache.get(u)
-                if val is not None:
-                    Hydration._post_cache.set(u, val)
+        for u in all_uris:
+            val = post_get(u)
+            if val is None:
+                missing_uris.append(u)
+            else:
+                post_touch(u)
                 uri_to_post[u] = val
 
+        fetched_users: Dict[str, Any] = {}
+        fetched_posts: Dict[str, Any] = {}
+        if missing_dids or missing_uris:
+            # 2) Get a single BlueskyAPI object: the one with the fewest
+            #    requests in flight, breaking ties by least used overall so
+            #    idle clients are taken in turn.
+            api = min(api_clients, key=lambda c: (c.in_flight, c.total_requests))
+
+            # 3) Bulk fetch only missing user data and post data in parallel
+            async def fetch_missing_users():
+                if not missing_dids:
+                    return {}
+                return await api.get_user_data_for_dids(missing_dids)
+
+            async def fetch_missing_posts():
+                if not missing_uris:
+                    return {}
+                return await api.hydrate_records_for_uris(missing_uris)
+
+            with api.track_request():
+                fetched_users, fetched_posts = await asyncio.gather(
+                    fetch_missing_users(), fetch_missing_posts()
+                )
+
+        # 4) Put the fetched items (already plain JSON dicts) into the cache
+        user_max = Hydration.user_cache_size
+        post_max = Hydration.post_cache_size
+
+        for did, profile in fetched_users.items():
+            user_cache[did] = profile
+            # Another batch may have fetched the same DID meanwhile
+            user_cache.move_to_end(did)
+            if len(user_cache) > user_max:
+                user_cache.popitem(last=False)  # evict least recently used
+        for uri, post_data in fetched_posts.items():
+            post_cache[uri] = post_data
+            post_cache.move_to_end(uri)
+            if len(post_cache) > post_max:
+                post_cache.popitem(last=False)
+
+        # Merge fetched items with the cache hits
+        did_to_profile.update(fetched_users)
+        uri_to_post.update(fetched_posts)
+
         # 5) Final pass: build a new list of records with the desired shape
         enriched_list = []
+        profile_get = did_to_profile.get
+        post_lookup = uri_to_post.get
+        embed_get = record_embed_map.get
+        enriched_append = enriched_list.append
 
         for idx, rec in enumerate(records):
-            commit = rec.get("commit", {})
-            c_record = commit.get("record", {})
+            commit, c_record, parent_uri, root_uri = record_parts[idx]
 
             # Construct an at_uri if possible from commit data
             did = rec.get("did", "")
@@ -218,22 +209,19 @@ class Hydration:
             time_us = c_record.get("time_us", None)
 
             # The user is the 'did' who posted
-            user_profile = did_to_profile.get(did, None)
+            user_profile = profile_get(did, None)
 
             # Mentions: a dict of { mention_did -> user_profile }
-            mention_dict = {}
-            for mention_did in record_mentions_map[idx]:
-                mention_dict[mention_did] = did_to_profile.get(mention_did)
+            mention_dict = {
+                mention_did: profile_get(mention_did)
+                for mention_did in record_mentions_map[idx]
+            }
 
             # Parent & root post data
-            reply = c_record.get("reply", {})
-            parent_uri = reply.get("parent", {}).get("uri")
-            parent_post = uri_to_post.get(parent_uri) if parent_uri else None
-
-            root_uri = reply.get("root", {}).get("uri")
-            root_post = uri_to_post.get(root_uri) if root_uri else None
-            quote_uri = record_embed_map.get(idx)
-            quote_post = uri_to_post.get(quote_uri) if quote_uri else None
+            parent_post = post_lookup(parent_uri) if parent_uri else None
+            root_post = post_lookup(root_uri) if root_uri else None
+            quote_uri = embed_get(idx)
+            quote_post = post_lookup(quote_uri) if quote_uri else None
 
             hydrated_metadata = {
                 "user": user_profile,
@@ -250,5 +238,5 @@ class Hydration:
                 "message": rec,  # the entire raw record
                 "hydrated_metadata": hydrated_metadata,
             }
-            enriched_list.append(enriched_obj)
+            enriched_append(enriched_obj)
         return enriched_list
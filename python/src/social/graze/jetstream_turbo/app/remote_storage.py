@@ -2,9 +2,20 @@ import os
 import asyncio
 import aioboto3
 import logging
+from boto3.s3.transfer import TransferConfig
 
 logger = logging.getLogger(__name__)
 
+# Multipart settings for aioboto3's upload_file (an asyncio uploader, so
+# boto3's thread options don't apply). At most max_io_queue parts wait in
+# memory plus max_concurrency in flight: (16 + 16) x 16MB ~= 512MB peak.
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=16,
+    max_io_queue=16,
+)
+
 
 async def upload_file_to_s3(
     file_path: str, bucket: str, key: str, region_name: str = "us-east-1"
@@ -18,5 +29,5 @@ async def upload_file_to_s3(
     """
     session = aioboto3.Session()
     async with session.client("s3", region_name=region_name) as s3:
-        await s3.upload_file(file_path, bucket, key)
+        await s3.upload_file(file_path, bucket, key, Config=S3_TRANSFER_CONFIG)
     logger.info(f"Uploaded {file_path} to s3://{bucket}/{key}")
@@ -2,6 +2,7 @@ import json
 import random
 import asyncio
 import logging
+from collections import deque
 from typing import AsyncGenerator, List, Optional
 
 from social.graze.jetstream_turbo.app.client import JetstreamClient
@@ -35,9 +36,16 @@ class TurboCharger:
         self.endpoint = endpoint
         self.modulo = modulo
         self.shard = shard
+        # Decide the sharding filter once, not per record
+        if not modulo and not shard:
+            self._match = lambda _record: True
+        elif not modulo:
+            raise ValueError(f"shard {shard} requires a non-zero modulo")
+        else:
+            self._match = lambda record: record.get("time_us", 0) % modulo == shard
 
         self.client = JetstreamClient(endpoint)
-        self.buffer = []
+        self.buffer: deque = deque()
         self.semaphore = asyncio.Semaphore(100)
         self.storage = storage_instance
 
@@ -50,10 +58,9 @@ class TurboCharger:
         Reads raw messages from the jetstream, buffers them in groups of 100,
         hydrates them in parallel, and yields the enriched records.
         """
+        match = self._match
         async for record in self.client.run_stream():
-            if (not self.modulo and not self.shard) or (
-                record.get("time_us") % self.modulo == self.shard
-            ):
+            if match(record):
                 self.buffer.append(record)
             if len(self.buffer) >= BATCH_SIZE:
                 await self._process_batch()
@@ -66,8 +73,8 @@ class TurboCharger:
         """
         Processes a batch of up to 100 records by hydrating them in bulk.
         """
-        batch = self.buffer[:BATCH_SIZE]
-        self.buffer = self.buffer[BATCH_SIZE:]
+        popleft = self.buffer.popleft
+        batch = [popleft() for _ in range(min(BATCH_SIZE, len(self.buffer)))]
 
         await self.semaphore.acquire()
         asyncio.create_task(self._hydrate_and_release(batch, self.semaphore))